@@ -0,0 +1,738 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Differential equivalence and performance harness for xUnique engines.
+
+Every fixture project runs through each available engine combination, with and
+without sorting PBXFileReference/PBXBuildFile sections by file name ('-p'):
+
+- reference: reference_xUnique.py, a frozen copy of xUnique 4.1.4 which
+  uniquifies and sorts the project file in place with fileinput. Do not edit it,
+  every other engine must produce its output byte for byte.
+- parser: how project.pbxproj is converted to JSON ('plutil')
+- pipeline: 'legacy' uniquifies and sorts the project file in place,
+  'fused' cleans the content in memory like 'xunique --stdin' does, and
+  'filter-process' sends it to the git long running filter process over
+  pkt-line streams in memory. Both run xUnique the way git does, whatever the
+  parser.
+
+Each combination also runs with '-g', except the reference which does not
+support it, and the outputs of the other engines are compared to each other.
+
+Fixtures are the projects in tools/fixtures, the projects given as arguments
+and randomly generated projects: for every seed a project, and one with
+unreachable groups and targets checked with '-g' only, since their leftovers
+break the project file without it. One large project makes the filter process
+split the content into several packets. Other projects in the directory of a fixture,
+e.g. its subprojects, are uniquified once and linked next to the copy every
+engine works on, like in a repository where all of them use xUnique.
+
+All combinations must produce output identical to the reference, and a second
+run on that output must make no changes. Fixtures with other projects beside
+them are also cleaned like the git filter does, with those projects left as they
+are, e.g. not uniquified yet: the output must be the same, and every
+remoteGlobalIDString must be defined in the cleaned output of a project.
+A side-by-side timing and peak memory table is printed at the end. Exit status
+is 1 if any check failed.
+
+usage: python tools/engine_harness.py [--random N] [--seed S] [path/to/Fixture.xcodeproj ...]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from os import path, makedirs, listdir, symlink, devnull
+from io import open as io_open, BytesIO
+from shutil import rmtree, copytree
+from tempfile import mkdtemp
+from timeit import default_timer
+from random import Random
+from re import compile as re_compile
+from glob import glob
+from contextlib import contextmanager
+from optparse import OptionParser, Values
+import sys
+
+try:
+    from shutil import which
+except ImportError:  # python 2
+    from distutils.spawn import find_executable as which
+try:
+    import tracemalloc
+except ImportError:  # python 2
+    tracemalloc = None
+
+here = path.dirname(path.abspath(__file__))
+sys.path.insert(0, path.dirname(here))
+from xUnique import (XUnique, decoded_string, filter_pbxproj, run_filter_process, read_pkt_line,
+                     read_pkt_list, write_pkt_list, write_pkt_content)
+from reference_xUnique import XUnique as ReferenceXUnique
+
+FIXTURES_DIR = path.join(here, 'fixtures')
+
+# parser name => (XUnique class using the parser, availability check)
+PARSERS = [
+    ('plutil', XUnique, lambda: bool(which('plutil'))),
+]
+
+
+def run_legacy(xunique_cls, work_path, content, sort_pbx_by_file_name, gc):
+    pbxproj_path = path.join(work_path, 'project.pbxproj')
+    with io_open(pbxproj_path, 'wb') as pbxproj_file:
+        pbxproj_file.write(content)
+    xunique = xunique_cls(work_path)
+    if gc:
+        xunique.unique_project(gc)
+    else:
+        # the reference does not know gc
+        xunique.unique_project()
+    xunique.sort_pbxproj(sort_pbx_by_file_name)
+    with io_open(pbxproj_path, 'rb') as pbxproj_file:
+        return pbxproj_file.read(), xunique.is_modified
+
+
+def filter_options(sort_pbx_by_file_name=False, gc=False):
+    return Values({'verbose': False, 'unique_bool': False, 'sort_bool': False,
+                   'sort_pbx_fn_bool': sort_pbx_by_file_name, 'gc_bool': gc})
+
+
+def run_fused(xunique_cls, work_path, content, sort_pbx_by_file_name, gc):
+    output = filter_pbxproj(work_path, content, filter_options(sort_pbx_by_file_name, gc))
+    return output, output != content
+
+
+# LARGE_PACKET_DATA_MAX of git, longer packets are rejected by git
+GIT_PKT_LINE_MAX_DATA = 65516
+
+
+def run_git_filter_process(xunique_cls, work_path, content, sort_pbx_by_file_name, gc):
+    """talk to run_filter_process like git does, checking the pkt-line framing of the response"""
+    request = BytesIO()
+    write_pkt_list(request, ['git-filter-client', 'version=2'])
+    write_pkt_list(request, ['capability=clean', 'capability=smudge'])
+    write_pkt_list(request, ['command=clean', 'pathname={}'.format(path.join(work_path, 'project.pbxproj'))])
+    write_pkt_content(request, content)
+    request.seek(0)
+    response = BytesIO()
+    stdin, stdout = sys.stdin, sys.stdout
+    sys.stdin, sys.stdout = request, response
+    try:
+        run_filter_process(filter_options(sort_pbx_by_file_name, gc))
+    finally:
+        sys.stdin, sys.stdout = stdin, stdout
+    response.seek(0)
+    for expected in (['git-filter-server', 'version=2'], ['capability=clean'], ['status=success']):
+        received = read_pkt_list(response)
+        if received != expected:
+            raise ValueError('filter process responded {}, expected {}'.format(received, expected))
+    chunks = []
+    while True:
+        data = read_pkt_line(response)
+        if data is None:
+            break
+        if len(data) > GIT_PKT_LINE_MAX_DATA:
+            raise ValueError('filter process sent a packet of {} bytes'.format(len(data)))
+        chunks.append(data)
+    if read_pkt_list(response) != [] or response.read():
+        raise ValueError('filter process sent unexpected data after the content')
+    output = b''.join(chunks)
+    return output, output != content
+
+
+PIPELINES = [
+    ('legacy', run_legacy),
+    ('fused', run_fused),
+    ('filter-process', run_git_filter_process),
+]
+
+# the reference only works in place, and needs plutil as well
+REFERENCE = ('reference', ReferenceXUnique, run_legacy, lambda: bool(which('plutil')))
+
+
+@contextmanager
+def quiet():
+    """xUnique reports its progress on stdout, keep the table readable"""
+    stdout = sys.stdout
+    with open(devnull, 'w') as null_file:
+        sys.stdout = null_file
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+def measure(func, *args):
+    """return result, seconds and peak traced memory in bytes (None without tracemalloc)"""
+    if tracemalloc:
+        tracemalloc.start()
+    start = default_timer()
+    try:
+        with quiet():
+            result = func(*args)
+    finally:
+        elapsed = default_timer() - start
+        peak = None
+        if tracemalloc:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+
+class RandomProject(object):
+    """generate a random, valid and unsorted project.pbxproj with Xcode style UUIDs, and maybe a subproject"""
+    words = ['App', 'Delegate', 'View', 'Controller', 'Model', 'Store', 'Cell', 'Network', 'Cache', 'Image',
+             'Helper', 'Manager', 'Service', 'Parser', 'Theme', 'Login', 'Feed', 'Profile', 'Settings', 'Player']
+    source_exts = [('m', 'sourcecode.c.objc'), ('swift', 'sourcecode.swift'), ('c', 'sourcecode.c.c')]
+    header_exts = [('h', 'sourcecode.c.h')]
+    resource_exts = [('png', 'image.png'), ('xib', 'file.xib'), ('plist', 'text.plist.xml')]
+    variant_exts = [('storyboard', 'file.storyboard'), ('strings', 'text.plist.strings')]
+    regions = ['Base', 'en', 'fr', 'zh-Hans']
+    frameworks = ['Foundation', 'UIKit', 'CoreData', 'CoreGraphics', 'QuartzCore', 'Security']
+    plain_value_ptn = re_compile(r'^[A-Za-z0-9_$/.]+$')
+
+    def __init__(self, seed, name=None, with_subproject=True, scale=1, garbage=False):
+        """`scale` multiplies the number of groups and targets, with `garbage` unreachable groups and targets
+        are generated, which only '-g' removes as a whole"""
+        self.rand = Random(seed)
+        self.name = name or 'Random{}'.format(seed)
+        self.with_subproject = with_subproject
+        self.scale = scale
+        self.garbage = garbage
+        self.used_ids = set()
+        self.objects = {}  # isa => [(key, comment, body)], body is a str for oneline objects, or list of lines
+        self.native_targets = []  # (target key, target name, product key, product name), for parent projects
+        self.subprojects = []
+
+    def new_id(self):
+        while True:
+            key = ''.join(self.rand.choice('0123456789ABCDEF') for _ in range(24))
+            if key not in self.used_ids:
+                self.used_ids.add(key)
+                return key
+
+    def quote(self, value):
+        if self.plain_value_ptn.search(value):
+            return value
+        return '"{}"'.format(value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+
+    def add(self, isa, key, comment, body):
+        self.objects.setdefault(isa, []).append((key, comment, body))
+
+    def ref_list(self, name, refs, indent='\t\t\t'):
+        lines = ['{}{} = ('.format(indent, name)]
+        lines.extend('{}\t{} /* {} */,'.format(indent, key, comment) for key, comment in refs)
+        lines.append('{});'.format(indent))
+        return lines
+
+    def shuffled(self, items, duplicate_ratio=0):
+        """shuffle a copy of items, sometimes with a duplicated item, which sorting removes"""
+        items = list(items)
+        if items and self.rand.random() < duplicate_ratio:
+            items.append(self.rand.choice(items))
+        self.rand.shuffle(items)
+        return items
+
+    def file_name(self, ext, used):
+        while True:
+            name = '{}{}'.format(self.rand.choice(self.words), self.rand.choice(self.words))
+            if ext:
+                name = '{}.{}'.format(name, ext)
+            if name not in used:
+                used.add(name)
+                return name
+
+    def file_ref(self, name, file_type, file_path=None, source_tree='<group>'):
+        key = self.new_id()
+        name_attr = 'name = {}; path = {}'.format(self.quote(name), self.quote(file_path)) if file_path \
+            else 'path = {}'.format(self.quote(name))
+        self.add('PBXFileReference', key, name, '{{isa = PBXFileReference; lastKnownFileType = {}; {}; sourceTree = {}; }};'.format(
+            self.quote(file_type), name_attr, self.quote(source_tree)))
+        return key
+
+    def group(self, name, children, key=None, isa='PBXGroup', name_attr='path'):
+        key = key or self.new_id()
+        lines = ['\t\t\tisa = {};'.format(isa)] + self.ref_list('children', self.shuffled(children, 0.2))
+        if name:
+            lines.append('\t\t\t{} = {};'.format(name_attr, self.quote(name)))
+        lines.append('\t\t\tsourceTree = "<group>";')
+        self.add(isa, key, name, lines)
+        return key
+
+    def variant_group(self, used):
+        ext, file_type = self.rand.choice(self.variant_exts)
+        name = self.file_name(ext, used)
+        children = []
+        for region in self.rand.sample(self.regions, self.rand.randint(1, len(self.regions))):
+            children.append((self.file_ref(region, file_type, '{}.lproj/{}'.format(region, name)), region))
+        return self.group(name, children, isa='PBXVariantGroup', name_attr='name'), name
+
+    def configuration_list(self, owner, settings):
+        configurations = []
+        for configuration_name in ('Debug', 'Release'):
+            key = self.new_id()
+            lines = ['\t\t\tisa = XCBuildConfiguration;', '\t\t\tbuildSettings = {']
+            lines.extend('\t\t\t\t{} = {};'.format(k, self.quote(v)) for k, v in sorted(settings.items()))
+            lines.extend(['\t\t\t};', '\t\t\tname = {};'.format(configuration_name)])
+            self.add('XCBuildConfiguration', key, configuration_name, lines)
+            configurations.append((key, configuration_name))
+        key = self.new_id()
+        comment = 'Build configuration list for {}'.format(owner)
+        lines = ['\t\t\tisa = XCConfigurationList;'] + self.ref_list('buildConfigurations', configurations)
+        lines.extend(['\t\t\tdefaultConfigurationIsVisible = 0;', '\t\t\tdefaultConfigurationName = Release;'])
+        self.add('XCConfigurationList', key, comment, lines)
+        return key, comment
+
+    def build_phase(self, isa, phase_name, file_refs, extra_lines=(), attributes=()):
+        """`attributes` are candidates of PBXBuildFile settings ATTRIBUTES, a file may have one or none"""
+        key = self.new_id()
+        build_files = []
+        for file_ref_key, file_name in file_refs:
+            build_file_key = self.new_id()
+            comment = '{} in {}'.format(file_name, phase_name)
+            settings = ''
+            if attributes and self.rand.random() < 0.7:
+                settings = ' settings = {{ATTRIBUTES = ({}, ); }};'.format(self.rand.choice(attributes))
+            self.add('PBXBuildFile', build_file_key, comment, '{{isa = PBXBuildFile; fileRef = {} /* {} */;{} }};'.format(
+                file_ref_key, file_name, settings))
+            build_files.append((build_file_key, comment))
+        lines = ['\t\t\tisa = {};'.format(isa), '\t\t\tbuildActionMask = 2147483647;']
+        lines.extend(self.ref_list('files', self.shuffled(build_files, 0.1)))
+        lines.extend(extra_lines)
+        lines.append('\t\t\trunOnlyForDeploymentPostprocessing = 0;')
+        self.add(isa, key, phase_name, lines)
+        return key, phase_name
+
+    def shell_script_phase(self):
+        script = 'echo "{}"\n'.format(self.rand.choice(self.words))
+        return self.build_phase('PBXShellScriptBuildPhase', 'ShellScript', [], [
+            '\t\t\tinputPaths = (', '\t\t\t);', '\t\t\toutputPaths = (', '\t\t\t);',
+            '\t\t\tshellPath = /bin/sh;', '\t\t\tshellScript = {};'.format(self.quote(script))])
+
+    def copy_files_phase(self, file_refs):
+        name = self.rand.choice([None, 'Embed Frameworks', 'Copy Plugins'])
+        extra_lines = ['\t\t\tdstPath = {};'.format(self.quote(self.rand.choice(['', 'Plugins', '$(CONTENTS_FOLDER_PATH)']))),
+                       '\t\t\tdstSubfolderSpec = {};'.format(self.rand.choice([7, 10, 13, 16]))]
+        if name:
+            extra_lines.append('\t\t\tname = {};'.format(self.quote(name)))
+        return self.build_phase('PBXCopyFilesBuildPhase', name or 'CopyFiles', file_refs, extra_lines,
+                                ['CodeSignOnCopy, RemoveHeadersOnCopy', 'CodeSignOnCopy'])
+
+    def build_rule(self):
+        key = self.new_id()
+        if self.rand.random() < 0.5:
+            lines = ['\t\t\tisa = PBXBuildRule;',
+                     '\t\t\tcompilerSpec = com.apple.compilers.proxy.script;',
+                     '\t\t\tfilePatterns = "*.{}";'.format(self.rand.choice(['metal', 'proto', 'y', 'rl'])),
+                     '\t\t\tfileType = pattern.proxy;',
+                     '\t\t\tisEditable = 1;',
+                     '\t\t\toutputFiles = (', '\t\t\t\t"$(DERIVED_FILE_DIR)/$(INPUT_FILE_BASE).c",', '\t\t\t);',
+                     '\t\t\tscript = "process \\"$INPUT_FILE_PATH\\"\\n";']
+        else:
+            lines = ['\t\t\tisa = PBXBuildRule;',
+                     '\t\t\tcompilerSpec = com.apple.compilers.llvm.clang.1_0;',
+                     '\t\t\tfileType = {};'.format(self.rand.choice(['sourcecode.c', 'sourcecode.cpp.cpp'])),
+                     '\t\t\tisEditable = 1;',
+                     '\t\t\toutputFiles = (', '\t\t\t);']
+        self.add('PBXBuildRule', key, 'PBXBuildRule', lines)
+        return key, 'PBXBuildRule'
+
+    def target_dependency(self, portal_key, portal_name, target_key, target_name, local):
+        """PBXTargetDependency of a target in this project (`local`) or in a subproject"""
+        proxy_key = self.new_id()
+        self.add('PBXContainerItemProxy', proxy_key, 'PBXContainerItemProxy', [
+            '\t\t\tisa = PBXContainerItemProxy;',
+            '\t\t\tcontainerPortal = {} /* {} */;'.format(portal_key, portal_name),
+            '\t\t\tproxyType = 1;',
+            '\t\t\tremoteGlobalIDString = {};'.format(target_key),
+            '\t\t\tremoteInfo = {};'.format(self.quote(target_name))])
+        key = self.new_id()
+        lines = ['\t\t\tisa = PBXTargetDependency;']
+        if local:
+            lines.append('\t\t\ttarget = {} /* {} */;'.format(target_key, target_name))
+        else:
+            lines.append('\t\t\tname = {};'.format(self.quote(target_name)))
+        lines.append('\t\t\ttargetProxy = {} /* PBXContainerItemProxy */;'.format(proxy_key))
+        self.add('PBXTargetDependency', key, 'PBXTargetDependency', lines)
+        return key, 'PBXTargetDependency'
+
+    def subproject_reference(self):
+        """reference a generated subproject: its file reference, product group of PBXReferenceProxy and
+        dependable targets"""
+        subproject = RandomProject(self.rand.randint(0, 1 << 30), '{}Lib'.format(self.name), with_subproject=False)
+        subproject.generate()
+        self.subprojects.append(subproject)
+        file_name = '{}.xcodeproj'.format(subproject.name)
+        file_key = self.file_ref(file_name, 'wrapper.pb-project')
+        reference_proxies = []
+        for _, target_name, product_key, product_name in subproject.native_targets:
+            proxy_key = self.new_id()
+            self.add('PBXContainerItemProxy', proxy_key, 'PBXContainerItemProxy', [
+                '\t\t\tisa = PBXContainerItemProxy;',
+                '\t\t\tcontainerPortal = {} /* {} */;'.format(file_key, file_name),
+                '\t\t\tproxyType = 2;',
+                '\t\t\tremoteGlobalIDString = {};'.format(product_key),
+                '\t\t\tremoteInfo = {};'.format(self.quote(target_name))])
+            reference_proxy_key = self.new_id()
+            self.add('PBXReferenceProxy', reference_proxy_key, product_name, [
+                '\t\t\tisa = PBXReferenceProxy;',
+                '\t\t\tfileType = wrapper.application;',
+                '\t\t\tpath = {};'.format(self.quote(product_name)),
+                '\t\t\tremoteRef = {} /* PBXContainerItemProxy */;'.format(proxy_key),
+                '\t\t\tsourceTree = BUILT_PRODUCTS_DIR;'])
+            reference_proxies.append((reference_proxy_key, product_name))
+        product_group_key = self.group('Products', reference_proxies, name_attr='name')
+        targets = [(file_key, file_name, target_key, target_name)
+                   for target_key, target_name, _, _ in subproject.native_targets]
+        return (file_key, file_name), product_group_key, targets
+
+    def garbage_target(self, target_name, sources):
+        """a PBXNativeTarget not in targets of the project, building some reachable sources"""
+        rand = self.rand
+        configuration_list = self.configuration_list('PBXNativeTarget "{}"'.format(target_name),
+                                                     {'PRODUCT_NAME': '$(TARGET_NAME)'})
+        build_phases = [self.build_phase('PBXSourcesBuildPhase', 'Sources',
+                                         rand.sample(sources, rand.randint(0, len(sources))))]
+        key = self.new_id()
+        lines = ['\t\t\tisa = PBXNativeTarget;',
+                 '\t\t\tbuildConfigurationList = {} /* {} */;'.format(*configuration_list)]
+        lines.extend(self.ref_list('buildPhases', build_phases))
+        lines.extend(self.ref_list('buildRules', []))
+        lines.extend(self.ref_list('dependencies', []))
+        lines.extend(['\t\t\tname = {};'.format(self.quote(target_name)),
+                      '\t\t\tproductName = {};'.format(self.quote(target_name)),
+                      '\t\t\tproductType = "com.apple.product-type.application";'])
+        self.add('PBXNativeTarget', key, target_name, lines)
+        return key, target_name
+
+    def generate(self):
+        rand = self.rand
+        project_key = self.new_id()
+        main_group_key = self.new_id()
+        used_names = set()
+        sources, headers, resources, source_groups = [], [], [], []
+        for _ in range(rand.randint(1, 4) * self.scale):
+            group_name = self.file_name(None, used_names)
+            children = []
+            for _ in range(rand.randint(1, 12)):
+                ext, file_type = rand.choice(self.source_exts + self.header_exts + self.resource_exts)
+                file_name = self.file_name(ext, used_names)
+                key = self.file_ref(file_name, file_type)
+                children.append((key, file_name))
+                if (ext, file_type) in self.source_exts:
+                    sources.append((key, file_name))
+                elif (ext, file_type) in self.header_exts:
+                    headers.append((key, file_name))
+                else:
+                    resources.append((key, file_name))
+            if rand.random() < 0.4:
+                variant = self.variant_group(used_names)
+                children.append(variant)
+                resources.append(variant)
+            source_groups.append((self.group(group_name, children), group_name))
+        frameworks = []
+        for framework in rand.sample(self.frameworks, rand.randint(1, len(self.frameworks))):
+            file_name = '{}.framework'.format(framework)
+            key = self.new_id()
+            self.add('PBXFileReference', key, file_name,
+                     '{{isa = PBXFileReference; lastKnownFileType = wrapper.framework; name = {0}; path = System/Library/Frameworks/{0}; sourceTree = SDKROOT; }};'.format(
+                         file_name))
+            frameworks.append((key, file_name))
+        # unreachable file references, removed by uniquify
+        for _ in range(rand.randint(0, 2)):
+            self.file_ref(self.file_name('m', used_names), 'sourcecode.c.objc')
+        main_children = source_groups[:]
+        project_references, remote_targets = [], []
+        if self.with_subproject and rand.random() < 0.5:
+            subproject_file, product_group_key, remote_targets = self.subproject_reference()
+            main_children.append(subproject_file)
+            project_references.append((product_group_key, subproject_file))
+
+        targets, products = [], []
+        target_kinds = self.shuffled(['native'] * rand.randint(1, 3) * self.scale + ['aggregate'] * rand.randint(0, 1))
+        for index, target_kind in enumerate(target_kinds):
+            dependencies = [self.target_dependency(project_key, 'Project object', target_key, target_name, True)
+                            for target_key, target_name in targets if rand.random() < 0.5]
+            dependencies.extend(self.target_dependency(*i, local=False) for i in remote_targets if rand.random() < 0.5)
+            target_key = self.new_id()
+            if target_kind == 'aggregate':
+                target_name = '{}Lint{}'.format(self.name, index)
+                configuration_list = self.configuration_list('PBXAggregateTarget "{}"'.format(target_name), {})
+                lines = ['\t\t\tisa = PBXAggregateTarget;',
+                         '\t\t\tbuildConfigurationList = {} /* {} */;'.format(*configuration_list)]
+                lines.extend(self.ref_list('buildPhases', [self.shell_script_phase()]))
+                lines.extend(self.ref_list('dependencies', dependencies))
+                lines.extend(['\t\t\tname = {};'.format(self.quote(target_name)),
+                              '\t\t\tproductName = {};'.format(self.quote(target_name))])
+                self.add('PBXAggregateTarget', target_key, target_name, lines)
+                targets.append((target_key, target_name))
+                continue
+            target_name = '{}{}'.format(self.name, index or '')
+            product_name = '{}.app'.format(target_name)
+            product_key = self.new_id()
+            self.add('PBXFileReference', product_key, product_name,
+                     '{{isa = PBXFileReference; explicitFileType = wrapper.application; includeInIndex = 0; path = {}; sourceTree = BUILT_PRODUCTS_DIR; }};'.format(
+                         product_name))
+            products.append((product_key, product_name))
+            build_phases = [
+                self.build_phase('PBXSourcesBuildPhase', 'Sources', rand.sample(sources, rand.randint(0, len(sources)))),
+                self.build_phase('PBXFrameworksBuildPhase', 'Frameworks', rand.sample(frameworks, rand.randint(0, len(frameworks)))),
+                self.build_phase('PBXResourcesBuildPhase', 'Resources', rand.sample(resources, rand.randint(0, len(resources)))),
+            ]
+            if rand.random() < 0.5:
+                build_phases.append(self.build_phase('PBXHeadersBuildPhase', 'Headers',
+                                                     rand.sample(headers, rand.randint(0, len(headers))),
+                                                     attributes=['Public', 'Private']))
+            if rand.random() < 0.5:
+                build_phases.append(self.copy_files_phase(rand.sample(frameworks, rand.randint(0, len(frameworks)))))
+            if rand.random() < 0.5:
+                build_phases.append(self.shell_script_phase())
+            configuration_list = self.configuration_list('PBXNativeTarget "{}"'.format(target_name),
+                                                         {'PRODUCT_NAME': '$(TARGET_NAME)'})
+            lines = ['\t\t\tisa = PBXNativeTarget;',
+                     '\t\t\tbuildConfigurationList = {} /* {} */;'.format(*configuration_list)]
+            lines.extend(self.ref_list('buildPhases', self.shuffled(build_phases)))
+            lines.extend(self.ref_list('buildRules', [self.build_rule() for _ in range(rand.randint(0, 2))]))
+            lines.extend(self.ref_list('dependencies', dependencies))
+            lines.extend(['\t\t\tname = {};'.format(self.quote(target_name)),
+                          '\t\t\tproductName = {};'.format(self.quote(target_name)),
+                          '\t\t\tproductReference = {} /* {} */;'.format(product_key, product_name),
+                          '\t\t\tproductType = "com.apple.product-type.application";'])
+            self.add('PBXNativeTarget', target_key, target_name, lines)
+            targets.append((target_key, target_name))
+            self.native_targets.append((target_key, target_name, product_key, product_name))
+
+        # unreachable groups and targets, whose TargetAttributes are still kept in PBXProject
+        garbage_targets = []
+        if self.garbage:
+            for _ in range(rand.randint(1, 2)):
+                children = [(self.file_ref(file_name, 'sourcecode.c.objc'), file_name)
+                            for file_name in (self.file_name('m', used_names) for _ in range(rand.randint(0, 3)))]
+                self.group(self.file_name(None, used_names), children)
+            for index in range(rand.randint(1, 2)):
+                garbage_targets.append(self.garbage_target('{}Removed{}'.format(self.name, index), sources))
+
+        products_group = (self.group('Products', products, name_attr='name'), 'Products')
+        frameworks_group = (self.group('Frameworks', frameworks, name_attr='name'), 'Frameworks')
+        self.group(None, main_children + [frameworks_group, products_group], main_group_key)
+        configuration_list = self.configuration_list('PBXProject "{}"'.format(self.name), {'SDKROOT': 'iphoneos'})
+        lines = ['\t\t\tisa = PBXProject;', '\t\t\tattributes = {', '\t\t\t\tTargetAttributes = {']
+        for target_key, _ in targets + garbage_targets:
+            lines.extend(['\t\t\t\t\t{} = {{'.format(target_key), '\t\t\t\t\t\tCreatedOnToolsVersion = 7.0;', '\t\t\t\t\t};'])
+        lines.extend(['\t\t\t\t};', '\t\t\t};',
+                      '\t\t\tbuildConfigurationList = {} /* {} */;'.format(*configuration_list),
+                      '\t\t\tcompatibilityVersion = "Xcode 3.2";',
+                      '\t\t\tmainGroup = {};'.format(main_group_key),
+                      '\t\t\tproductRefGroup = {} /* Products */;'.format(products_group[0]),
+                      '\t\t\tprojectDirPath = "";'])
+        if project_references:
+            lines.append('\t\t\tprojectReferences = (')
+            for product_group_key, (file_key, file_name) in project_references:
+                lines.extend(['\t\t\t\t{',
+                              '\t\t\t\t\tProductGroup = {} /* Products */;'.format(product_group_key),
+                              '\t\t\t\t\tProjectRef = {} /* {} */;'.format(file_key, file_name),
+                              '\t\t\t\t},'])
+            lines.append('\t\t\t);')
+        lines.append('\t\t\tprojectRoot = "";')
+        lines.extend(self.ref_list('targets', targets))
+        self.add('PBXProject', project_key, 'Project object', lines)
+        self.content = self.render(project_key)
+        return self.content
+
+    def render(self, project_key):
+        lines = ['// !$*UTF8*$!', '{', '\tarchiveVersion = 1;', '\tclasses = {', '\t};',
+                 '\tobjectVersion = 46;', '\tobjects = {', '']
+        for isa in sorted(self.objects):
+            lines.append('/* Begin {} section */'.format(isa))
+            for key, comment, body in self.shuffled(self.objects[isa]):
+                head = '\t\t{} /* {} */ = '.format(key, comment) if comment else '\t\t{} = '.format(key)
+                if isinstance(body, list):
+                    lines.append(head + '{')
+                    lines.extend(body)
+                    lines.append('\t\t};')
+                else:
+                    lines.append(head + body)
+            lines.extend(['/* End {} section */'.format(isa), ''])
+        lines.extend(['\t};', '\trootObject = {} /* Project object */;'.format(project_key), '}', ''])
+        return '\n'.join(lines).encode('utf-8')
+
+    def write(self, directory):
+        """write the generated project and its subprojects into directory, return path of the project"""
+        for project in [self] + self.subprojects:
+            xcodeproj_path = path.join(directory, '{}.xcodeproj'.format(project.name))
+            makedirs(xcodeproj_path)
+            with io_open(path.join(xcodeproj_path, 'project.pbxproj'), 'wb') as pbxproj_file:
+                pbxproj_file.write(project.content)
+        return path.join(directory, '{}.xcodeproj'.format(self.name))
+
+
+def prepare_siblings(siblings_dir, fixture_path):
+    """copies of the projects in the directory of the fixture with all but the fixture uniquified and sorted,
+    other entries are linked"""
+    source_dir, name = path.split(fixture_path)
+    makedirs(siblings_dir)
+    projects = []
+    for entry in listdir(source_dir):
+        if entry.endswith('.xcodeproj'):
+            copytree(path.join(source_dir, entry), path.join(siblings_dir, entry))
+            if entry != name:
+                projects.append(entry)
+        else:
+            symlink(path.join(source_dir, entry), path.join(siblings_dir, entry))
+    with quiet():
+        for entry in projects:
+            sibling = ReferenceXUnique(path.join(siblings_dir, entry))
+            sibling.unique_project()
+            sibling.sort_pbxproj()
+    return siblings_dir
+
+
+def prepare_work_path(run_dir, siblings_dir, name):
+    """an empty project dir named as the fixture, with the other entries of siblings_dir linked beside it"""
+    makedirs(run_dir)
+    for entry in listdir(siblings_dir):
+        if entry != name:
+            symlink(path.join(siblings_dir, entry), path.join(run_dir, entry))
+    work_path = path.join(run_dir, name)
+    makedirs(work_path)
+    return work_path
+
+
+object_key_ptn = re_compile(r'(?m)^\s*([0-9A-F]{32}) .*= \{')
+remote_global_id_ptn = re_compile(r'remoteGlobalIDString = ([0-9A-Z]+);')
+
+
+def check_cross_project_keys(fixture_path, siblings_dir, label, failures):
+    """clean the fixture and the projects beside it like the git filter does, with those projects as they are in
+    the fixture dir: the result must be the same as with those projects uniquified, and the keys must line up"""
+    source_dir, name = path.split(fixture_path)
+    siblings = [entry for entry in listdir(source_dir) if entry != name and entry.endswith('.xcodeproj')]
+    if not siblings:
+        return
+    outputs = {}
+    try:
+        with quiet():
+            for entry in [name] + siblings:
+                with io_open(path.join(source_dir, entry, 'project.pbxproj'), 'rb') as pbxproj_file:
+                    outputs[entry] = filter_pbxproj(path.join(source_dir, entry), pbxproj_file.read(), filter_options())
+            with io_open(path.join(fixture_path, 'project.pbxproj'), 'rb') as pbxproj_file:
+                expected = filter_pbxproj(path.join(siblings_dir, name), pbxproj_file.read(), filter_options())
+    except (SystemExit, Exception) as e:
+        failures.append('{} filter: {}'.format(label, e))
+        return
+    if outputs[name] != expected:
+        failures.append('{} filter: output depends on whether the projects beside it are uniquified'.format(label))
+    defined_keys = set()
+    for output in outputs.values():
+        defined_keys.update(object_key_ptn.findall(decoded_string(output, 'utf-8')))
+    for remote_key in remote_global_id_ptn.findall(decoded_string(outputs[name], 'utf-8')):
+        if remote_key not in defined_keys:
+            failures.append('{} filter: remoteGlobalIDString {} is not defined in any cleaned project'.format(
+                label, remote_key))
+
+
+def check_fixture(work_dir, fixture_path, engines, rows, failures, gc_only=False):
+    label = '/'.join(fixture_path.split(path.sep)[-2:])
+    siblings_dir = prepare_siblings(path.join(work_dir, 'siblings', str(len(rows))), fixture_path)
+    with io_open(path.join(fixture_path, 'project.pbxproj'), 'rb') as pbxproj_file:
+        content = pbxproj_file.read()
+    for gc in (True,) if gc_only else (False, True):
+        for sort_pbx_by_file_name in (False, True):
+            option = ' '.join(name for name, on in (('-g', gc), ('-p', sort_pbx_by_file_name)) if on)
+            outputs = []
+            row = ['{} {}'.format(label, option).strip()]
+            for engine_name, xunique_cls, run, supports_gc in engines:
+                if gc and not supports_gc:
+                    row.append('-')
+                    continue
+                run_dir = path.join(work_dir, 'runs', str(len(rows)), engine_name.replace('/', '-'))
+                work_path = prepare_work_path(run_dir, siblings_dir, path.basename(fixture_path))
+                try:
+                    (output, _), elapsed, peak = measure(run, xunique_cls, work_path, content,
+                                                         sort_pbx_by_file_name, gc)
+                    (second_output, modified), _, _ = measure(run, xunique_cls, work_path, output,
+                                                              sort_pbx_by_file_name, gc)
+                except (SystemExit, Exception) as e:
+                    failures.append('{} {}: {}'.format(row[0], engine_name, e))
+                    row.append('error')
+                    continue
+                if modified or second_output != output:
+                    failures.append('{} {}: second run made changes'.format(row[0], engine_name))
+                outputs.append((engine_name, run_dir, output))
+                row.append('{:.1f}ms {}'.format(elapsed * 1000, '{}KiB'.format(peak // 1024) if peak is not None else '-'))
+            for engine_name, run_dir, output in outputs[1:]:
+                if output != outputs[0][2]:
+                    failures.append('{} {}: output differs from {}, see {}'.format(
+                        row[0], engine_name, outputs[0][0], path.join(run_dir, 'output.pbxproj')))
+                    with io_open(path.join(run_dir, 'output.pbxproj'), 'wb') as output_file:
+                        output_file.write(output)
+            rows.append(row)
+    if not gc_only:
+        check_cross_project_keys(fixture_path, siblings_dir, label, failures)
+
+
+def print_table(header, rows):
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    for row in [header, ['-' * w for w in widths]] + rows:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def main():
+    usage = "usage: %prog [--random N] [--seed S] [--keep] [path/to/Fixture.xcodeproj ...]"
+    parser = OptionParser(usage=usage, description=__doc__.strip().split('\n')[0])
+    parser.add_option("-r", "--random", type="int", dest="random_count", default=10,
+                      help="number of randomly generated fixture projects. default is 10.")
+    parser.add_option("--seed", type="int", dest="seed", default=0,
+                      help="seed of the first random fixture project, the following ones use seed+1, seed+2... default is 0.")
+    parser.add_option("-k", "--keep", action="store_true", dest="keep", default=False,
+                      help="keep the working directory with all outputs.")
+    (options, args) = parser.parse_args(sys.argv[1:])
+    engines = []
+    reference_name, reference_cls, reference_run, reference_available = REFERENCE
+    if reference_available():
+        engines.append((reference_name, reference_cls, reference_run, False))
+    else:
+        print('reference is not available, outputs are only compared between engines', file=sys.stderr)
+    for parser_name, xunique_cls, available in PARSERS:
+        if not available():
+            print('parser "{}" is not available, skipped'.format(parser_name), file=sys.stderr)
+            continue
+        for pipeline_name, run in PIPELINES:
+            engines.append(('{}/{}'.format(parser_name, pipeline_name), xunique_cls, run, True))
+    if not engines:
+        raise SystemExit('No parser available.')
+
+    work_dir = mkdtemp(prefix='xunique-harness-')
+    # (path, whether only checked with '-g')
+    fixture_paths = [(i, False) for i in sorted(glob(path.join(FIXTURES_DIR, '*', '*.xcodeproj')))]
+    for fixture_path in args:
+        fixture_path = path.abspath(decoded_string(fixture_path))
+        if fixture_path.endswith('project.pbxproj'):
+            fixture_path = path.dirname(fixture_path)
+        fixture_paths.append((fixture_path, False))
+    fixtures = [(RandomProject(options.seed, 'Large{}'.format(options.seed), scale=8), False)]
+    for seed in range(options.seed, options.seed + options.random_count):
+        fixtures.append((RandomProject(seed), False))
+        fixtures.append((RandomProject(seed, 'Garbage{}'.format(seed), garbage=True), True))
+    for fixture, gc_only in fixtures:
+        fixture.generate()
+        fixture_paths.append((fixture.write(path.join(work_dir, 'generated', fixture.name)), gc_only))
+    assert len(fixtures[0][0].content) > 2 * GIT_PKT_LINE_MAX_DATA, 'large fixture fits in two packets'
+
+    rows, failures = [], []
+    try:
+        for fixture_path, gc_only in fixture_paths:
+            check_fixture(work_dir, fixture_path, engines, rows, failures, gc_only)
+    finally:
+        if options.keep or failures:
+            print('outputs kept in', work_dir, file=sys.stderr)
+        else:
+            rmtree(work_dir)
+    print_table(['fixture'] + [engine[0] for engine in engines], rows)
+    if failures:
+        print('\n{} checks failed:'.format(len(failures)))
+        print('\n'.join(failures))
+        raise SystemExit(1)
+    print('\nAll {} fixtures identical and idempotent across {} engines.'.format(len(fixture_paths), len(engines)))
+
+
+if __name__ == '__main__':
+    main()
@@ -20,15 +20,19 @@ the License.
 
 from __future__ import unicode_literals
 from __future__ import print_function
-from subprocess import (check_output as sp_co, CalledProcessError)
-from os import path, unlink, rename
+from subprocess import (Popen as sp_popen, PIPE as sp_pipe, CalledProcessError)
+from os import path, devnull
+from io import open as io_open
 from hashlib import md5 as hl_md5
 from json import (loads as json_loads, dump as json_dump)
-from fileinput import (input as fi_input, close as fi_close)
 from re import compile as re_compile
+import sys
 from sys import (argv as sys_argv, getfilesystemencoding as sys_get_fs_encoding, version_info)
-from filecmp import cmp as filecmp_cmp
 from optparse import OptionParser
+from contextlib import contextmanager
+from glob import glob
+from multiprocessing.pool import ThreadPool
+from xml.sax.saxutils import unescape as xml_unescape
 
 
 def construct_compatibility_layer():
@@ -57,10 +61,11 @@ six = construct_compatibility_layer()
 md5_hex = lambda a_str: hl_md5(a_str.encode('utf-8')).hexdigest().upper()
 if six.PY2:
     print_ng = lambda *args, **kwargs: print(*[six.text_type(i).encode(sys_get_fs_encoding()) for i in args], **kwargs)
-    output_u8line = lambda *args: print(*[six.text_type(i).encode('utf-8') for i in args], end='')
 elif six.PY3:
     print_ng = lambda *args, **kwargs: print(*args, **kwargs)
-    output_u8line = lambda *args: print(*args, end='')
+
+# raw byte streams of stdin/stdout, used by git filter modes
+binary_stream = lambda stream: getattr(stream, 'buffer', stream)
 
 
 def decoded_string(string, encoding=None):
@@ -69,6 +74,15 @@ def decoded_string(string, encoding=None):
     return string.decode(encoding or sys_get_fs_encoding())
 
 
+def split_lines(text):
+    """split text into lines keeping line endings, like iterating a file"""
+    lines = [line + '\n' for line in text.split('\n')]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
 def warning_print(*args, **kwargs):
     new_args = list(args)
     new_args[0] = '\x1B[33m{}'.format(new_args[0])
@@ -84,10 +98,12 @@ def success_print(*args, **kwargs):
 
 
 class XUnique(object):
-    def __init__(self, target_path, verbose=False):
+    def __init__(self, target_path, verbose=False, pbxproj_content=None):
+        """When `pbxproj_content` is given, the project file is processed in memory and never written back,
+        `target_path` is then only used to locate the project and its subprojects."""
         # check project path
         abs_target_path = path.abspath(target_path)
-        if not path.exists(abs_target_path):
+        if pbxproj_content is None and not path.exists(abs_target_path):
             raise XUniqueExit('Path "',abs_target_path ,'" not found!')
         elif abs_target_path.endswith('xcodeproj'):
             self.xcodeproj_path = abs_target_path
@@ -99,6 +115,11 @@ class XUnique(object):
             raise XUniqueExit("Path must be dir '.xcodeproj' or file 'project.pbxproj'")
         self.verbose = verbose
         self.vprint = print if self.verbose else lambda *a, **k: None
+        self.in_memory = pbxproj_content is not None
+        if self.in_memory:
+            self.pbxproj_lines = split_lines(decoded_string(pbxproj_content, 'utf-8'))
+        else:
+            self.pbxproj_lines = self.read_pbxproj()
         self.proj_root = self.get_proj_root()
         self.proj_json = self.pbxproj_to_json()
         self.nodes = self.proj_json['objects']
@@ -117,22 +138,57 @@ class XUnique(object):
                                 }
             })
         self._is_modified = False
+        self._modified_scheme_paths = []
 
     @property
     def is_modified(self):
-        return self._is_modified
+        return self._is_modified or bool(self._modified_scheme_paths)
+
+    @property
+    def modified_paths(self):
+        """project file and scheme files modified by xUnique"""
+        return ([self.xcode_pbxproj_path] if self._is_modified else []) + self._modified_scheme_paths
+
+    @property
+    def pbxproj_content(self):
+        return ''.join(self.pbxproj_lines)
+
+    def read_pbxproj(self):
+        # project.pbxproj is an utf-8 encoded file
+        with io_open(self.xcode_pbxproj_path, encoding='utf-8') as pbxproj_file:
+            return pbxproj_file.readlines()
+
+    def write_pbxproj(self, lines):
+        """keep `lines` as current content, and write it back to project file unless working in memory"""
+        self.pbxproj_lines = lines
+        self._is_modified = True
+        if not self.in_memory:
+            with io_open(self.xcode_pbxproj_path, 'w', encoding='utf-8') as pbxproj_file:
+                pbxproj_file.writelines(lines)
 
     def pbxproj_to_json(self):
-        pbproj_to_json_cmd = ['plutil', '-convert', 'json', '-o', '-', self.xcode_pbxproj_path]
+        if self.in_memory:
+            pbproj_to_json_cmd = ['plutil', '-convert', 'json', '-o', '-', '-']
+            pbxproj_input = self.pbxproj_content.encode('utf-8')
+        else:
+            pbproj_to_json_cmd = ['plutil', '-convert', 'json', '-o', '-', self.xcode_pbxproj_path]
+            pbxproj_input = None
         try:
-            json_unicode_str = decoded_string(sp_co(pbproj_to_json_cmd))
+            try:
+                process = sp_popen(pbproj_to_json_cmd, stdin=sp_pipe, stdout=sp_pipe)
+            except OSError as ose:
+                raise CalledProcessError(-1, pbproj_to_json_cmd, six.text_type(ose))
+            output = process.communicate(pbxproj_input)[0]
+            if process.returncode:
+                raise CalledProcessError(process.returncode, pbproj_to_json_cmd, output)
+            json_unicode_str = decoded_string(output)
             return json_loads(json_unicode_str)
         except CalledProcessError as cpe:
             raise XUniqueExit("""{}
 Please check:
 1. You have installed Xcode Command Line Tools and command 'plutil' could be found in $PATH;
 2. The project file is not broken, such like merge conflicts, incomplete content due to xUnique failure. """.format(
-                cpe.output))
+                decoded_string(cpe.output)))
 
     def __update_result(self, current_hex, path, new_key, atype):
         old = self.__result.get(current_hex)
@@ -165,14 +221,11 @@ Please check:
     def get_proj_root(self):
         """PBXProject name,the root node"""
         pbxproject_ptn = re_compile('(?<=PBXProject ").*(?=")')
-        with open(self.xcode_pbxproj_path) as pbxproj_file:
-            for line in pbxproj_file:
-                # project.pbxproj is an utf-8 encoded file
-                line = decoded_string(line, 'utf-8')
-                result = pbxproject_ptn.search(line)
-                if result:
-                    # Backward compatibility using suffix
-                    return '{}.xcodeproj'.format(result.group())
+        for line in self.pbxproj_lines:
+            result = pbxproject_ptn.search(line)
+            if result:
+                # Backward compatibility using suffix
+                return '{}.xcodeproj'.format(result.group())
         # project file must be in ASCII format
         if 'Pods.xcodeproj' in self.xcode_pbxproj_path:
             raise XUniqueExit("Pods project file should be in ASCII format, but Cocoapods converted Pods project file to XML by default. Install 'xcproj' in your $PATH via brew to fix.")
@@ -185,10 +238,20 @@ Please check:
         sub_proj = self._subproject.get(abspath)
         if sub_proj is None:
             sub_proj = XUnique(abspath, self.verbose)
+            if self.in_memory:
+                # the subproject in working tree may not be uniquified yet, refer to its objects by the keys
+                # it gets when uniquified, so the result does not depend on the working tree
+                sub_proj.__unique_project(sub_proj.root_hex)
             self._subproject[abspath] = sub_proj
         return sub_proj
 
-    def unique_project(self):
+    def subproject_key(self, subproject, old_hex):
+        """key of the subproject object `old_hex` to refer to from this project"""
+        if self.in_memory and old_hex in subproject.__result:
+            return subproject.__result[old_hex]['new_key']
+        return old_hex
+
+    def unique_project(self, gc=False):
         """iterate all nodes in pbxproj file:
 
         PBXProject
@@ -203,25 +266,57 @@ Please check:
         PBXFileReference
         PBXGroup
         PBXVariantGroup
+
+        With `gc`, object definitions not reachable from rootObject are removed as a whole.
         """
         self.__unique_project(self.root_hex)
-        if self.verbose:
+        if self.verbose and self.in_memory:
+            # no file is written when working in memory
+            json_dump(self.__result, sys.stderr)
+            print('', file=sys.stderr)
+        elif self.verbose:
             debug_result_file_path = path.join(self.xcodeproj_path, 'debug_result.json')
             with open(debug_result_file_path, 'w') as debug_result_file:
                 json_dump(self.__result, debug_result_file)
             warning_print("Debug result json file has been written to '", debug_result_file_path, sep='')
-        self.substitute_old_keys()
+        self.substitute_old_keys(gc)
 
-    def substitute_old_keys(self):
+    def substitute_old_keys(self, gc=False):
         self.vprint('replace UUIDs and remove unused UUIDs')
         key_ptn = re_compile('(?<=\s)([0-9A-Z]{24}|[0-9A-F]{32})(?=[\s;])')
+        object_start_ptn = re_compile(r'^(\s*)([0-9A-Z]{24}|[0-9A-F]{32})\s+(?:\/\*.+?\*\/\s*)?=\s*\{(.+};)?\s*$')
+        object_end_ptn = r"^{space}\}};\s*$"
         removed_lines = []
-        for line in fi_input(self.xcode_pbxproj_path, backup='.ubak', inplace=1):
-            # project.pbxproj is an utf-8 encoded file
-            line = decoded_string(line, 'utf-8')
+        new_lines = []
+        # objects not visited in node tree are unreachable from rootObject
+        garbage_end_ptn = None
+        # the first object definition tells the indent of objects, deeper ones are nested in other objects,
+        # e.g. TargetAttributes of PBXProject, removed but not counted
+        object_indent = None
+        garbage_count = 0
+        garbage_size = 0
+        for line in self.pbxproj_lines:
+            if garbage_end_ptn:
+                garbage_size += len(line.encode('utf-8'))
+                if garbage_end_ptn.search(line):
+                    garbage_end_ptn = None
+                continue
+            if gc:
+                object_match = object_start_ptn.search(line)
+                if object_match and object_indent is None:
+                    object_indent = object_match.group(1)
+                if object_match and object_match.group(2) in self.nodes \
+                        and object_match.group(2) not in self.__result:
+                    if object_match.group(1) == object_indent:
+                        self.vprint('collect unreachable object', line.strip())
+                        garbage_count += 1
+                    garbage_size += len(line.encode('utf-8'))
+                    if not object_match.group(3):  # multiline object
+                        garbage_end_ptn = re_compile(object_end_ptn.format(space=object_match.group(1)))
+                    continue
             key_list = key_ptn.findall(line)
             if not key_list:
-                output_u8line(line)
+                new_lines.append(line)
             else:
                 new_line = line
                 # remove line with non-existing element
@@ -237,23 +332,86 @@ Please check:
                     for key in key_list:
                         new_key = self.__result[key]['new_key']
                         new_line = new_line.replace(key, new_key)
-                    output_u8line(new_line)
-        fi_close()
-        tmp_path = self.xcode_pbxproj_path + '.ubak'
-        if filecmp_cmp(self.xcode_pbxproj_path, tmp_path, shallow=False):
-            unlink(self.xcode_pbxproj_path)
-            rename(tmp_path, self.xcode_pbxproj_path)
+                    new_lines.append(new_line)
+        if new_lines == self.pbxproj_lines:
             warning_print('Ignore uniquify, no changes made to "', self.xcode_pbxproj_path, sep='')
         else:
-            unlink(tmp_path)
-            self._is_modified = True
+            self.write_pbxproj(new_lines)
             success_print('Uniquify done')
+            if garbage_count:
+                success_print('Removed {} unreachable objects, {} bytes reclaimed'.format(garbage_count, garbage_size))
             if self.__result.get('uniquify_warning'):
                 warning_print(*self.__result['uniquify_warning'])
             if removed_lines:
                 warning_print('Following lines were deleted because of invalid format or no longer being used:')
                 print_ng(*removed_lines, end='')
 
+    def scheme_paths(self, workspace_path=None):
+        """all shared and user .xcscheme files in the project and the workspace, with their container path"""
+        containers = [self.xcodeproj_path]
+        if workspace_path:
+            containers.append(path.abspath(workspace_path))
+        for container_path in containers:
+            for scheme_ptn in ('xcshareddata/xcschemes/*.xcscheme', 'xcuserdata/*.xcuserdatad/xcschemes/*.xcscheme'):
+                for scheme_path in sorted(glob(path.join(container_path, scheme_ptn))):
+                    yield container_path, scheme_path
+
+    def rewrite_schemes(self, workspace_path=None):
+        """replace BlueprintIdentifier of this project's objects in .xcscheme files with uniquified keys.
+        Must be called after `unique_project`. Return paths of rewritten scheme files."""
+        self.vprint('rewrite BlueprintIdentifier in schemes')
+        key_map = dict((old_key, value['new_key']) for old_key, value in self.__result.items()
+                       if isinstance(value, dict) and value['new_key'] != old_key)
+        if not key_map:
+            warning_print('Ignore schemes, no keys changed in "', self.xcode_pbxproj_path, sep='')
+            return []
+        buildable_reference_ptn = re_compile(r'<BuildableReference\b[^>]*>')
+        container_ptn = re_compile(r'\bReferencedContainer\s*=\s*"container:([^"]*)"')
+        blueprint_id_ptn = re_compile(r'(\bBlueprintIdentifier\s*=\s*")([^"]*)(")')
+
+        def replace_blueprint_id(match):
+            return '{}{}{}'.format(match.group(1), key_map.get(match.group(2), match.group(2)), match.group(3))
+
+        def rewrite_scheme(container_and_scheme_path):
+            container_path, scheme_path = container_and_scheme_path
+            # containers are relative to the directory of the project or workspace owning the scheme
+            container_dir = path.dirname(container_path)
+
+            def replace_reference(match):
+                reference = match.group()
+                container_match = container_ptn.search(reference)
+                if not container_match or path.normpath(
+                        path.join(container_dir, xml_unescape(container_match.group(1)))) != self.xcodeproj_path:
+                    return reference
+                return blueprint_id_ptn.sub(replace_blueprint_id, reference)
+
+            with io_open(scheme_path, encoding='utf-8', newline='') as scheme_file:
+                content = scheme_file.read()
+            new_content = buildable_reference_ptn.sub(replace_reference, content)
+            if new_content == content:
+                return None
+            with io_open(scheme_path, 'w', encoding='utf-8', newline='') as scheme_file:
+                scheme_file.write(new_content)
+            return scheme_path
+
+        scheme_paths = list(self.scheme_paths(workspace_path))
+        if not scheme_paths:
+            warning_print('Ignore schemes, no scheme files found for "', self.xcodeproj_path, sep='')
+            return []
+        pool = ThreadPool()
+        try:
+            rewritten_paths = [i for i in pool.map(rewrite_scheme, scheme_paths) if i]
+        finally:
+            pool.close()
+            pool.join()
+        self._modified_scheme_paths.extend(rewritten_paths)
+        if rewritten_paths:
+            success_print('Rewrite schemes done')
+            print_ng(*rewritten_paths, sep='\n')
+        else:
+            warning_print('Ignore schemes, no changes made to ', len(scheme_paths), ' scheme files', sep='')
+        return rewritten_paths
+
     def sort_pbxproj(self, sort_pbx_by_file_name=False):
         self.vprint('sort project.xpbproj file')
         removed_lines = []
@@ -308,7 +466,8 @@ Please check:
             x = children_pbx_key_ptn.search(x).group()
             return '.' in x, x
 
-        output_stack = [output_u8line]
+        new_lines = []
+        output_stack = [new_lines.append]
         write = lambda *args: output_stack[-1](*args)
 
         deal_stack = []
@@ -411,27 +570,15 @@ Please check:
                 return
             write(line)
         deal_stack.append(deal_global_line)
-        try:
-            for line in fi_input(self.xcode_pbxproj_path, backup='.sbak', inplace=1):
-                # project.pbxproj is an utf-8 encoded file
-                line = decoded_string(line, 'utf-8')
-                deal(line)
-            assert len(deal_stack) == 1 and len(output_stack) == 1
-        except Exception as e:
-            fi_close()
-            tmp_path = self.xcode_pbxproj_path + '.sbak'
-            unlink(self.xcode_pbxproj_path)
-            rename(tmp_path, self.xcode_pbxproj_path)
-            raise e
-        fi_close()
-        tmp_path = self.xcode_pbxproj_path + '.sbak'
-        if filecmp_cmp(self.xcode_pbxproj_path, tmp_path, shallow=False):
-            unlink(self.xcode_pbxproj_path)
-            rename(tmp_path, self.xcode_pbxproj_path)
+        for line in self.pbxproj_lines:
+            deal(line)
+        assert len(deal_stack) == 1 and len(output_stack) == 1
+        # sorted items are written as joined chunks, compare by whole content
+        new_content = ''.join(new_lines)
+        if new_content == self.pbxproj_content:
             warning_print('Ignore sort, no changes made to "', self.xcode_pbxproj_path, sep='')
         else:
-            unlink(tmp_path)
-            self._is_modified = True
+            self.write_pbxproj(split_lines(new_content))
             success_print('Sort done')
             if removed_lines:
                 warning_print('Following lines were deleted because of duplication:')
@@ -535,12 +682,13 @@ Please check:
                     proxyType = int(current_node.get('proxyType', -1))
                     if proxyType == 1:
                         self.__result[remote_global_id_hex] = {
-                            'new_key': next((v for v in subproject.root_node['targets']
+                            'new_key': next((self.subproject_key(subproject, v) for v in subproject.root_node['targets']
                                              if subproject.nodes[v]['name'] == info),
                                             remote_global_id_hex)}
                     elif proxyType == 2:
                         self.__result[remote_global_id_hex] = {
-                            'new_key': next((subproject.nodes[v]['productReference'] for v in subproject.root_node['targets']
+                            'new_key': next((self.subproject_key(subproject, subproject.nodes[v]['productReference'])
+                                             for v in subproject.root_node['targets']
                                              if subproject.nodes[v]['name'] == info),
                                             remote_global_id_hex)}
                     else: # unknown type, ignore it
@@ -631,8 +779,147 @@ class XUniqueExit(SystemExit):
         super(XUniqueExit, self).__init__(value)
 
 
+def run_xunique(xunique, options):
+    if not (options.unique_bool or options.sort_bool):
+        print_ng("Uniquify and Sort")
+        xunique.unique_project(options.gc_bool)
+        xunique.sort_pbxproj(options.sort_pbx_fn_bool)
+        success_print("Uniquify and Sort done")
+    else:
+        if options.unique_bool:
+            print_ng('Uniquify...')
+            xunique.unique_project(options.gc_bool)
+        if options.sort_bool:
+            print_ng('Sort...')
+            xunique.sort_pbxproj(options.sort_pbx_fn_bool)
+
+
+@contextmanager
+def redirect_messages(verbose):
+    """In git filter modes stdout carries the project file content, and git may run the filter on every
+    `git status`. Messages are dropped, or go to stderr when verbose. Errors are raised as usual."""
+    stdout = sys.stdout
+    sys.stdout = sys.stderr if verbose else open(devnull, 'w')
+    try:
+        yield
+    finally:
+        if not verbose:
+            sys.stdout.close()
+        sys.stdout = stdout
+
+
+def filter_pbxproj(target_path, pbxproj_content, options):
+    """uniquify and/or sort utf-8 encoded project file content in memory, return the result bytes"""
+    with redirect_messages(options.verbose):
+        xunique = XUnique(target_path, options.verbose, pbxproj_content)
+        run_xunique(xunique, options)
+    return xunique.pbxproj_content.encode('utf-8')
+
+
+def run_stdin_filter(target_path, options):
+    """git clean filter: read project file from stdin and write the result to stdout"""
+    pbxproj_content = binary_stream(sys.stdin).read()
+    result = filter_pbxproj(target_path, pbxproj_content, options)
+    stdout = binary_stream(sys.stdout)
+    stdout.write(result)
+    stdout.flush()
+
+
+PKT_LINE_MAX_DATA = 65516
+
+
+def read_pkt_line(stream):
+    """read one pkt-line, return None for a flush packet"""
+    header = stream.read(4)
+    if not header:
+        raise EOFError
+    length = int(header, 16)
+    if length == 0:
+        return None
+    return stream.read(length - 4)
+
+
+def read_pkt_list(stream):
+    """read text pkt-lines until a flush packet"""
+    lines = []
+    while True:
+        data = read_pkt_line(stream)
+        if data is None:
+            return lines
+        lines.append(decoded_string(data, 'utf-8').rstrip('\n'))
+
+
+def read_pkt_content(stream):
+    """read binary pkt-lines until a flush packet"""
+    chunks = []
+    while True:
+        data = read_pkt_line(stream)
+        if data is None:
+            return b''.join(chunks)
+        chunks.append(data)
+
+
+def write_pkt_line(stream, data):
+    stream.write('{:04x}'.format(len(data) + 4).encode('ascii'))
+    stream.write(data)
+
+
+def write_pkt_flush(stream):
+    stream.write(b'0000')
+    stream.flush()
+
+
+def write_pkt_list(stream, lines):
+    for line in lines:
+        write_pkt_line(stream, '{}\n'.format(line).encode('utf-8'))
+    write_pkt_flush(stream)
+
+
+def write_pkt_content(stream, content):
+    for i in range(0, len(content), PKT_LINE_MAX_DATA):
+        write_pkt_line(stream, content[i:i + PKT_LINE_MAX_DATA])
+    write_pkt_flush(stream)
+
+
+def run_filter_process(options):
+    """git long running filter process (gitattributes "filter.<driver>.process"), serving "clean" command.
+    One interpreter is kept warm for all project files git asks to clean."""
+    stdin = binary_stream(sys.stdin)
+    stdout = binary_stream(sys.stdout)
+    welcome = read_pkt_list(stdin)
+    if not welcome or welcome[0] != 'git-filter-client' or 'version=2' not in welcome[1:]:
+        raise XUniqueExit("Unsupported git filter protocol: ", ' '.join(welcome))
+    write_pkt_list(stdout, ['git-filter-server', 'version=2'])
+    capabilities = read_pkt_list(stdin)
+    if 'capability=clean' not in capabilities:
+        raise XUniqueExit("git filter protocol does not support 'clean' capability")
+    write_pkt_list(stdout, ['capability=clean'])
+    while True:
+        try:
+            headers = read_pkt_list(stdin)
+        except EOFError:
+            break
+        metadata = dict(header.split('=', 1) for header in headers if '=' in header)
+        pbxproj_content = read_pkt_content(stdin)
+        if metadata.get('command') != 'clean':
+            write_pkt_list(stdout, ['status=error'])
+            continue
+        try:
+            result = filter_pbxproj(metadata['pathname'], pbxproj_content, options)
+        except (XUniqueExit, Exception) as e:
+            print_ng(e, file=sys.stderr)
+            write_pkt_list(stdout, ['status=error'])
+            continue
+        write_pkt_list(stdout, ['status=success'])
+        write_pkt_content(stdout, result)
+        # empty list, keep "status=success"
+        write_pkt_flush(stdout)
+
+
 def main():
-    usage = "usage: %prog [-v][-u][-s][-c][-p] path/to/Project.xcodeproj"
+    usage = """usage: %prog [-v][-u][-s][-c][-p][-g][--schemes][--workspace path/to/Workspace.xcworkspace] path/to/Project.xcodeproj
+       %prog [-v][-u][-s][-p][-g] --stdin path/to/Project.xcodeproj
+       %prog [-v][-u][-s][-p][-g] --filter-process"""
     description = "Doc: https://github.com/truebit/xUnique"
     parser = OptionParser(usage=usage, description=description)
     parser.add_option("-v", "--verbose",
@@ -643,36 +930,52 @@ def main():
     parser.add_option("-s", "--sort", action="store_true", dest="sort_bool", default=False,
                       help="sort the project file. default is False. When neither '-u' nor '-s' option exists, xUnique will invisibly add both '-u' and '-s' in arguments")
     parser.add_option("-c", "--combine-commit", action="store_true", dest="combine_commit", default=False,
-                      help="When project file was modified, xUnique quit with 100 status. Without this option, the status code would be zero if so. This option is usually used in Git hook to submit xUnique result combined with your original new commit.")
+                      help="When project file, or scheme files with '--schemes', were modified, xUnique quit with 100 status. Without this option, the status code would be zero if so. This option is usually used in Git hook to submit xUnique result combined with your original new commit.")
     parser.add_option("-p", "--sort-pbx-by-filename", action="store_true", dest="sort_pbx_fn_bool", default=False,
                       help="sort PBXFileReference and PBXBuildFile sections in project file, ordered by file name. Without this option, ordered by MD5 digest, the same as Xcode does.")
+    parser.add_option("-g", "--gc", action="store_true", dest="gc_bool", default=False,
+                      help="when uniquifying, remove whole definitions of objects that are not reachable from the root project object, and report how many objects and bytes were reclaimed. default is False.")
+    parser.add_option("--schemes", action="store_true", dest="schemes_bool", default=False,
+                      help="after uniquifying, rewrite BlueprintIdentifier of the project targets in shared and user .xcscheme files of the project to the new keys. Only changed scheme files are written. default is False.")
+    parser.add_option("--workspace", dest="workspace_path", metavar="WORKSPACE",
+                      help="also rewrite .xcscheme files of this .xcworkspace referring to the project. Implies '--schemes'.")
+    parser.add_option("--stdin", action="store_true", dest="stdin_filter", default=False,
+                      help="read project file content from stdin and write the result to stdout, no file is modified. The path argument is still required to locate the project and its subprojects. Only errors are printed, to stderr, unless '-v' is given. This option is usually used as Git clean filter: 'xunique --stdin %f'.")
+    parser.add_option("--filter-process", action="store_true", dest="filter_process", default=False,
+                      help="run as Git long running filter process, cleaning every project file of a Git command in one process. No path argument is needed. This option is usually used as Git filter process: 'xunique --filter-process'.")
     (options, args) = parser.parse_args(sys_argv[1:])
+    if options.filter_process:
+        run_filter_process(options)
+        return
     if len(args) < 1:
         parser.print_help()
         raise XUniqueExit(
             "xUnique requires at least one positional argument: relative/absolute path to xcodeproj.")
     xcode_proj_path = decoded_string(args[0])
+    if options.stdin_filter:
+        run_stdin_filter(xcode_proj_path, options)
+        return
     xunique = XUnique(xcode_proj_path, options.verbose)
-    if not (options.unique_bool or options.sort_bool):
-        print_ng("Uniquify and Sort")
-        xunique.unique_project()
-        xunique.sort_pbxproj(options.sort_pbx_fn_bool)
-        success_print("Uniquify and Sort done")
+    run_xunique(xunique, options)
+    if options.schemes_bool or options.workspace_path:
+        if options.unique_bool or not options.sort_bool:
+            print_ng('Rewrite schemes...')
+            xunique.rewrite_schemes(options.workspace_path and decoded_string(options.workspace_path))
+        else:
+            warning_print("Ignore schemes, '--schemes' and '--workspace' only work with '-u'")
+    if xunique.modified_paths == [xunique.xcode_pbxproj_path]:
+        modified_str = "File 'project.pbxproj' was modified, please add it"
     else:
-        if options.unique_bool:
-            print_ng('Uniquify...')
-            xunique.unique_project()
-        if options.sort_bool:
-            print_ng('Sort...')
-            xunique.sort_pbxproj(options.sort_pbx_fn_bool)
+        modified_str = "Files {} were modified, please add them".format(
+            ', '.join("'{}'".format(i) for i in xunique.modified_paths))
     if options.combine_commit:
         if xunique.is_modified:
-            warning_print("File 'project.pbxproj' was modified, please add it and then commit.")
+            warning_print(modified_str, " and then commit.", sep='')
             raise SystemExit(100)
     else:
         if xunique.is_modified:
             warning_print(
-                "File 'project.pbxproj' was modified, please add it and commit again to submit xUnique result.\nNOTICE: If you want to submit xUnique result combined with original commit, use option '-c' in command.")
+                modified_str, " and commit again to submit xUnique result.\nNOTICE: If you want to submit xUnique result combined with original commit, use option '-c' in command.", sep='')
 
 
 if __name__ == '__main__':